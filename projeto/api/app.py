@@ -1,18 +1,37 @@
+import time
+
+# Marca o início da inicialização para o relatório de startup
+inicio_startup = time.perf_counter()
+
 import os
+import gc
+import json
 from fastapi import FastAPI
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 from pandas import read_csv
 from pandas import DataFrame
+from pandas import Index
 from pandas import concat
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from projeto.api import auth
 from projeto.api.auth import get_current_user
 from fastapi import Depends
-from sklearn.model_selection import train_test_split
-from projeto.api.modelo_utils import EntradaModelo, prever_categoria
+from projeto.api.modelo_utils import EntradaModelo, prever_categoria, carregar_modelo
 from projeto.api.log_config import configurar_logger
 from fastapi import Request
-import time
+
+# Tempos de cada fase da inicialização, em segundos
+tempos_startup = {"imports": round(time.perf_counter() - inicio_startup, 4)}
+
+# Com API_PRELOAD=1 o dataset e o modelo são carregados na importação do módulo.
+# Usado junto com o --preload do gunicorn, o carregamento acontece uma única vez no
+# processo master e os workers compartilham a memória via copy-on-write.
+PRELOAD = os.getenv("API_PRELOAD", "0") == "1"
+
+# Quantidade de livros serializados por bloco na resposta NDJSON
+TAMANHO_BLOCO_NDJSON = 500
 
 # Inicializando o FastAPI
 
@@ -25,6 +44,15 @@ app = FastAPI(
 # Chamando o Logging
 logger = configurar_logger()
 
+# Orçamento de tempo (em segundos) para a importação das dependências
+try:
+    ORCAMENTO_IMPORTS = float(os.getenv("API_IMPORT_BUDGET", "1.0"))
+except ValueError:
+    logger.warning(
+        f'API_IMPORT_BUDGET="{os.getenv("API_IMPORT_BUDGET")}" inválido, utilizando 1.0s'
+    )
+    ORCAMENTO_IMPORTS = 1.0
+
 
 # Utilizado o middleware para ativar o log de todas as requisições
 @app.middleware("http")
@@ -41,14 +69,23 @@ async def log_requisicoes(request: Request, call_next):
     return resposta
 
 
+inicio_rotas = time.perf_counter()
 app.include_router(auth.router)
 
+# DataFrame e índice de IDs mantidos em memória quando a API é iniciada em modo preload
+df_livros_precarregado = None
+indice_ids_precarregado = None
+
 
 def carregar_dataframe():
     """
     Função que carrega o DataFrame de livros a partir de um arquivo CSV.
+    No modo preload retorna o DataFrame já carregado em memória.
     """
 
+    if df_livros_precarregado is not None:
+        return df_livros_precarregado
+
     path_csv = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     path_csv = os.path.join(path_csv, "data", "books_dataset.csv")
 
@@ -59,6 +96,17 @@ def carregar_dataframe():
     return df_livros
 
 
+def carregar_indice_ids(df_livros: DataFrame) -> Index:
+    """
+    Retorna o índice da coluna de IDs do DataFrame de livros.
+    No modo preload o índice é construído uma única vez e reaproveitado.
+    """
+
+    if indice_ids_precarregado is not None and df_livros is df_livros_precarregado:
+        return indice_ids_precarregado
+    return Index(df_livros["id"])
+
+
 # Endpoints Core
 
 
@@ -215,6 +263,68 @@ def stats_price_range(min: float, max: float):
     return selecao.to_dict(orient="records")
 
 
+class EntradaLivrosLote(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+    campos: Optional[List[str]] = Field(None, min_length=1)
+    stream: bool = False
+
+
+@app.post("/api/v1/books/batch", tags=["Core"])
+def retorna_livros_em_lote(payload: EntradaLivrosLote):
+    """
+    Endpoint para retornar vários livros pelo ID em uma única chamada.
+    Opcionalmente é possível informar os campos que devem ser retornados.
+    Com `stream` ativo a resposta é enviada em NDJSON, um livro por linha e, na última linha, os IDs não encontrados.
+    O dataset e o índice de IDs só são carregados uma única vez com API_PRELOAD=1, caso contrário o CSV é lido a cada chamada.
+    """
+
+    df_livros = carregar_dataframe()
+    if df_livros.empty:
+        raise HTTPException(status_code=404, detail="Dados não disponíveis.")
+
+    # Remove campos repetidos mantendo a ordem da requisição
+    if payload.campos is None:
+        colunas = df_livros.columns.tolist()
+    else:
+        colunas = list(dict.fromkeys(payload.campos))
+    campos_invalidos = [campo for campo in colunas if campo not in df_livros.columns]
+    if campos_invalidos:
+        raise HTTPException(
+            status_code=400, detail=f"Campos inválidos: {', '.join(campos_invalidos)}"
+        )
+
+    # Remove IDs repetidos mantendo a ordem da requisição
+    ids = list(dict.fromkeys(payload.ids))
+
+    # Posição de cada ID no DataFrame (-1 quando não encontrado)
+    posicoes = carregar_indice_ids(df_livros).get_indexer(ids)
+    encontrados = posicoes >= 0
+    nao_encontrados = [
+        id_livro for id_livro, achou in zip(ids, encontrados) if not achou
+    ]
+
+    selecao = df_livros.iloc[
+        posicoes[encontrados], df_livros.columns.get_indexer(colunas)
+    ]
+
+    if payload.stream:
+
+        def gerar_ndjson():
+            for inicio in range(0, len(selecao), TAMANHO_BLOCO_NDJSON):
+                bloco = selecao.iloc[inicio : inicio + TAMANHO_BLOCO_NDJSON]
+                yield bloco.to_json(
+                    orient="records", lines=True, force_ascii=False
+                ).rstrip("\n") + "\n"
+            yield json.dumps({"nao_encontrados": nao_encontrados}) + "\n"
+
+        return StreamingResponse(gerar_ndjson(), media_type="application/x-ndjson")
+
+    return {
+        "livros": selecao.to_dict(orient="records"),
+        "nao_encontrados": nao_encontrados,
+    }
+
+
 @app.get("/api/v1/books/{id_livro}", tags=["Core"])
 def retorna_livro_por_id(id_livro: int):
     """
@@ -278,6 +388,9 @@ def ml_training_data():
     Para garantir a reprodutibilidade, foi fixado o random_state em 42.
     """
 
+    # Import tardio: o sklearn é pesado e só é necessário nesta rota
+    from sklearn.model_selection import train_test_split
+
     var_independente = ["preco_incl_tax", "disponibilidade_produto", "qtde_estrelas"]
 
     var_dependente = "categoria"
@@ -321,3 +434,39 @@ def fazer_predicao(payload: EntradaModelo):
         return resultado.to_dict(orient="records")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# Relatório de inicialização
+
+tempos_startup["rotas"] = round(time.perf_counter() - inicio_rotas, 4)
+
+if PRELOAD:
+    inicio_fase = time.perf_counter()
+    df_livros = carregar_dataframe()
+    if df_livros.empty:
+        # Sem cache: as requisições voltam a ler o CSV a cada chamada
+        logger.warning("startup preload sem dataset, o CSV será lido a cada requisição")
+    else:
+        df_livros_precarregado = df_livros
+        indice_ids_precarregado = carregar_indice_ids(df_livros)
+    tempos_startup["dataset"] = round(time.perf_counter() - inicio_fase, 4)
+
+    inicio_fase = time.perf_counter()
+    carregar_modelo()
+    tempos_startup["modelo"] = round(time.perf_counter() - inicio_fase, 4)
+
+    # Move os objetos já criados para a geração permanente do GC, evitando que as
+    # coletas nos workers toquem essas páginas e quebrem o copy-on-write
+    gc.freeze()
+
+tempos_startup["total"] = round(time.perf_counter() - inicio_startup, 4)
+
+logger.info(
+    f"startup preload={PRELOAD}, "
+    + ", ".join(f"{fase}={tempo}s" for fase, tempo in tempos_startup.items())
+)
+
+if tempos_startup["imports"] > ORCAMENTO_IMPORTS:
+    logger.warning(
+        f'startup imports={tempos_startup["imports"]}s acima do orçamento de {ORCAMENTO_IMPORTS}s'
+    )
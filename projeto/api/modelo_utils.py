@@ -1,5 +1,5 @@
 import os
-import joblib
+import threading
 import pandas as pd
 from pydantic import BaseModel
 from typing import List
@@ -12,11 +12,37 @@ path_encoder = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..", "models", "encoder.pkl")
 )
 
-try:
-    modelo = joblib.load(path_model)
-    encoder = joblib.load(path_encoder)
-except Exception as e:
-    raise RuntimeError(f"Erro ao carregaro modelo/encoder: {e}")
+# O modelo e o encoder são carregados sob demanda (ou no preload da API),
+# evitando o custo do joblib/sklearn na importação do módulo
+modelo = None
+encoder = None
+lock_modelo = threading.Lock()
+
+
+def carregar_modelo():
+    """
+    Carrega o modelo e o encoder uma única vez e reaproveita nas chamadas seguintes.
+    """
+    global modelo, encoder
+
+    if modelo is None or encoder is None:
+        # As rotas síncronas rodam em threads, então o carregamento é protegido
+        # para que requisições simultâneas não carreguem os arquivos em duplicidade
+        with lock_modelo:
+            if modelo is None or encoder is None:
+                import joblib
+
+                try:
+                    modelo_carregado = joblib.load(path_model)
+                    encoder_carregado = joblib.load(path_encoder)
+                except Exception as e:
+                    raise RuntimeError(f"Erro ao carregaro modelo/encoder: {e}")
+
+                encoder = encoder_carregado
+                modelo = modelo_carregado
+
+    return modelo, encoder
+
 
 # Classes de entrada
 
@@ -44,8 +70,9 @@ def prever_categoria(df: pd.DataFrame) -> pd.DataFrame:
     except KeyError:
         raise ValueError("As colunas não estão no formato esperado")
 
-    y_pred = modelo.predict(df_filtrado)
-    categorias = encoder.inverse_transform(y_pred)
+    modelo_carregado, encoder_carregado = carregar_modelo()
+    y_pred = modelo_carregado.predict(df_filtrado)
+    categorias = encoder_carregado.inverse_transform(y_pred)
 
     df_resultado = df_filtrado.copy()
     df_resultado["predicao"] = categorias